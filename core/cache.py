@@ -0,0 +1,59 @@
+# core/cache.py
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# ✅ Cache en memoria con TTL para respuestas de solo-lectura.
+# El deploy actual (Render + Neon) no tiene Redis; un cache por proceso
+# alcanza para evitar recomputar los mismos agregados en cada request.
+# Si algún día hay Redis, esta API (get/set/invalidate por prefijo) se
+# puede respaldar ahí sin tocar los routers.
+
+_lock = threading.Lock()
+_store: Dict[str, Tuple[float, Any]] = {}
+
+# ✅ Tope de entradas: varias claves embeben input del cliente sin
+# autenticar (grupo, limit, offset), así que sin tope cualquier cliente
+# anónimo podría crecer el store sin límite pidiendo variantes basura.
+_MAX_ENTRIES = 1024
+
+
+def cache_get(key: str) -> Optional[Any]:
+    """Devuelve el valor cacheado o None si no existe / expiró."""
+    with _lock:
+        entry = _store.get(key)
+        if entry is None:
+            return None
+        expira, value = entry
+        if time.monotonic() >= expira:
+            del _store[key]
+            return None
+        return value
+
+
+def cache_set(key: str, value: Any, ttl_seconds: int) -> None:
+    """Guarda `value` bajo `key` por `ttl_seconds`."""
+    with _lock:
+        now = time.monotonic()
+        # barrido de expiradas: cache_get solo borra la clave que lee,
+        # acá purgamos el resto para que no se acumulen (el tamaño está
+        # acotado por _MAX_ENTRIES, así que el scan es barato)
+        vencidas = [k for k, (expira, _) in _store.items() if now >= expira]
+        for k in vencidas:
+            del _store[k]
+        if key not in _store and len(_store) >= _MAX_ENTRIES:
+            # eviction simple: la entrada que expira más pronto
+            del _store[min(_store, key=lambda k: _store[k][0])]
+        _store[key] = (now + ttl_seconds, value)
+
+
+def cache_invalidate(prefix: str = "") -> int:
+    """
+    Borra todas las claves que empiecen con `prefix`.
+    Con prefix="" limpia todo. Devuelve cuántas claves borró.
+    """
+    with _lock:
+        keys = [k for k in _store if k.startswith(prefix)]
+        for k in keys:
+            del _store[k]
+        return len(keys)
@@ -1,13 +1,15 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from routers import parejas, desafios, jugadores, auth, ranking, push
 from database import init_db
 
 
-app = FastAPI(title="Ranking Pádel Backend")
+# ✅ PERF: orjson serializa las listas grandes (jugadores/cards/ranking)
+# bastante más rápido que el json.dumps default
+app = FastAPI(title="Ranking Pádel Backend", default_response_class=ORJSONResponse)
 @app.on_event("startup")
 def on_startup():
     init_db()
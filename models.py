@@ -3,6 +3,7 @@ from datetime import datetime
 
 from sqlalchemy import (
     Column,
+    Index,
     Integer,
     String,
     Boolean,
@@ -11,6 +12,7 @@ from sqlalchemy import (
     Time,
     ForeignKey,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import relationship
 from database import Base
@@ -27,6 +29,8 @@ class PushToken(Base):
     # ✅ MULTI-DEVICE: unique por (jugador_id, fcm_token)
     __table_args__ = (
         UniqueConstraint("jugador_id", "fcm_token", name="uq_push_tokens_jugador_fcm"),
+        # ✅ PERF: cubre la poda por jugador ordenada por created_at
+        Index("ix_push_tokens_jugador_created", "jugador_id", "created_at"),
     )
 
     jugador = relationship("Jugador", lazy="joined")
@@ -75,6 +79,28 @@ class Pareja(Base):
             "grupo",
             name="uq_pareja_jugadores_grupo",
         ),
+        # ✅ PERF: índices parciales para el lookup "mi dupla activa"
+        # (jugador1_id = :x OR jugador2_id = :x, activo)
+        Index(
+            "ix_parejas_jugador1_activo",
+            "jugador1_id",
+            postgresql_where=text("activo"),
+        ),
+        Index(
+            "ix_parejas_jugador2_activo",
+            "jugador2_id",
+            postgresql_where=text("activo"),
+        ),
+        # ✅ PERF: los listados filtran por grupo + activo y ordenan por
+        # posicion_actual → index scan sin nodo de sort
+        Index(
+            "ix_parejas_grupo_posicion",
+            "grupo",
+            "posicion_actual",
+            postgresql_where=text("activo AND posicion_actual IS NOT NULL"),
+        ),
+        # ✅ PERF: filtro por categoría (genero) + grupo exacto
+        Index("ix_parejas_genero_grupo", "genero", "grupo"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -86,6 +112,11 @@ class Pareja(Base):
     grupo = Column(String(1), nullable=False)
     posicion_actual = Column(Integer, nullable=True, index=True)
 
+    # ✅ PERF: "Nombre1 Apellido1 / Nombre2 Apellido2" materializado al
+    # registrar — los listados lo leen directo sin joinear jugadores.
+    # Nullable para no romper data existente (fallback al f-string).
+    nombre_pareja = Column(String(255), nullable=True)
+
     # ✅ NUEVO: género de la pareja ("M" o "F"). Nullable para no romper data existente.
     genero = Column(String(1), nullable=True, index=True)
 
@@ -114,6 +145,23 @@ class Pareja(Base):
 class Desafio(Base):
     __tablename__ = "desafios"
 
+    __table_args__ = (
+        # ✅ PERF: índices para los filtros calientes estado + pareja
+        # (stats/historial) y el orden fecha/hora/id de los listados
+        Index("ix_desafios_estado_retadora", "estado", "retadora_pareja_id"),
+        Index("ix_desafios_estado_retada", "estado", "retada_pareja_id"),
+        Index("ix_desafios_fecha_hora_id", "fecha", "hora", "id"),
+        # ✅ PERF: índice parcial solo de los Jugado con las tres columnas
+        # que leen los agregados de stats -> index-only scan
+        Index(
+            "ix_desafios_jugado_stats",
+            "retadora_pareja_id",
+            "retada_pareja_id",
+            "ganador_pareja_id",
+            postgresql_where=text("estado = 'Jugado'"),
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
 
     retadora_pareja_id = Column(Integer, ForeignKey("parejas.id"), nullable=False)
@@ -147,6 +195,10 @@ class Desafio(Base):
     # ✅ NUEVO: fecha en que se jugó (no la programada)
     fecha_jugado = Column(Date, nullable=True)
 
+    # ✅ NUEVO: cómo terminó: "normal" (con sets), "retiro" o "wo".
+    # Nullable por data legacy (fallback: Jugado sin ganador = retiro).
+    resultado_tipo = Column(String(20), nullable=True)
+
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -1,15 +1,18 @@
 # routers/desafios.py
+import asyncio
 from datetime import date, timedelta, datetime, time
 from typing import List, Optional, Set, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy import or_
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import or_, select, union_all
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from database import get_db
 from models import Pareja, Desafio, Jugador, PushToken
 from schemas.desafio import DesafioResponse, DesafioHistorialItem
+from core.cache import cache_invalidate
 from core.security import get_current_jugador
 from core.firebase_admin import send_push_to_tokens
 
@@ -69,6 +72,34 @@ def _ensure_hora_redonda(t: time) -> None:
         )
 
 
+def _pareja_activa_del_jugador(db: Session, jugador_id: int) -> Optional[Pareja]:
+    """
+    Busca la DUPLA activa más reciente del jugador.
+
+    ✅ PERF: UNION ALL de dos queries mono-columna en vez de
+    or_(jugador1_id == :x, jugador2_id == :x) — así cada rama usa su
+    propio índice parcial (ix_parejas_jugadorN_activo) en lugar de que
+    el planner caiga a bitmap/seq scan.
+    """
+    q1 = select(Pareja).where(
+        Pareja.activo.is_(True), Pareja.jugador1_id == jugador_id
+    )
+    q2 = select(Pareja).where(
+        Pareja.activo.is_(True), Pareja.jugador2_id == jugador_id
+    )
+
+    parejas = (
+        db.query(Pareja)
+        .from_statement(union_all(q1, q2))
+        .all()
+    )
+    if not parejas:
+        return None
+
+    # la "más reciente" = id más alto (mismo criterio que order_by(id.desc()))
+    return max(parejas, key=lambda p: p.id)
+
+
 def _pareja_label(db: Session, pareja: Pareja) -> str:
     j1 = db.get(Jugador, pareja.jugador1_id)
     j2 = db.get(Jugador, pareja.jugador2_id)
@@ -365,6 +396,19 @@ def _delete_invalid_tokens(invalid_tokens: List[str]) -> None:
             pass
 
 
+# FCM acepta hasta 500 tokens por multicast
+_PUSH_BATCH_SIZE = 500
+
+# ✅ PERF: plantilla precompilada del body del push de resultado
+# (evita re-armar la cadena con concatenaciones f"" en cada envío)
+_RESULTADO_BODY_TMPL = (
+    "🏆 Ganó: {ganador}\n"
+    "🎾 Sets: {sets}\n"
+    "{puesto}"
+    "👉 Toca para ver el detalle"
+)
+
+
 def _add_background_push(
     background_tasks: BackgroundTasks,
     tokens: List[str],
@@ -372,14 +416,31 @@ def _add_background_push(
     body: str,
     data: dict,
 ) -> None:
-    def _job():
-        try:
-            result = send_push_to_tokens(tokens, title=title, body=body, data=data)
-            invalids = (result or {}).get("invalid_tokens") or []
-            if invalids:
-                _delete_invalid_tokens(invalids)
-        except Exception as e:
-            print("❌ Error enviando push (background):", str(e))
+    async def _job():
+        # ✅ PERF: lotes de 500 enviados en paralelo (threadpool, el SDK de
+        # Firebase es sync). La respuesta HTTP ya salió; acá solo solapamos
+        # los envíos en vez de serializarlos.
+        batches = [
+            tokens[i : i + _PUSH_BATCH_SIZE]
+            for i in range(0, len(tokens), _PUSH_BATCH_SIZE)
+        ]
+
+        async def _send(batch: List[str]):
+            try:
+                return await run_in_threadpool(
+                    send_push_to_tokens, batch, title=title, body=body, data=data
+                )
+            except Exception as e:
+                print("❌ Error enviando push (background):", str(e))
+                return None
+
+        results = await asyncio.gather(*(_send(b) for b in batches))
+
+        invalids: List[str] = []
+        for result in results:
+            invalids.extend((result or {}).get("invalid_tokens") or [])
+        if invalids:
+            _delete_invalid_tokens(invalids)
 
     background_tasks.add_task(_job)
 
@@ -433,6 +494,7 @@ def _apply_forfeit_if_expired(db: Session) -> int:
         d.estado = "Jugado"
         d.ganador_pareja_id = retadora.id
         d.fecha_jugado = date.today()
+        d.resultado_tipo = "wo"
 
         # ✅ MARCAR W.O. (sin tocar sets int)
         wo_msg = "W.O. automático: desafiado no respondió en 3 días."
@@ -467,6 +529,10 @@ def _apply_forfeit_if_expired(db: Session) -> int:
 
     if updated:
         db.commit()
+        # los W.O. cambian stats/posiciones -> invalidar listados cacheados
+        cache_invalidate("jugadores:")
+        cache_invalidate("parejas:")
+        cache_invalidate("ranking:")
 
     return updated
 
@@ -478,18 +544,7 @@ def mi_dupla(
     db: Session = Depends(get_db),
     jugador_actual: Jugador = Depends(get_current_jugador),
 ):
-    p = (
-        db.query(Pareja)
-        .filter(
-            Pareja.activo.is_(True),
-            or_(
-                Pareja.jugador1_id == jugador_actual.id,
-                Pareja.jugador2_id == jugador_actual.id,
-            ),
-        )
-        .order_by(Pareja.id.desc())
-        .first()
-    )
+    p = _pareja_activa_del_jugador(db, jugador_actual.id)
 
     if not p:
         raise HTTPException(status_code=404, detail="No tenés una DUPLA activa asignada.")
@@ -664,18 +719,7 @@ def crear_desafio(
 ):
     _apply_forfeit_if_expired(db)
 
-    retadora = (
-        db.query(Pareja)
-        .filter(
-            Pareja.activo.is_(True),
-            or_(
-                Pareja.jugador1_id == jugador_actual.id,
-                Pareja.jugador2_id == jugador_actual.id,
-            ),
-        )
-        .order_by(Pareja.id.desc())
-        .first()
-    )
+    retadora = _pareja_activa_del_jugador(db, jugador_actual.id)
     if not retadora:
         raise HTTPException(
             status_code=400,
@@ -714,7 +758,7 @@ def crear_desafio(
 
     db.add(nuevo_desafio)
     db.commit()
-    db.refresh(nuevo_desafio)
+    # sin refresh: expire_on_commit=False conserva los valores ya seteados
 
     recipients: Set[int] = {
         retada.jugador1_id,
@@ -783,7 +827,6 @@ def aceptar_desafio(
 
     desafio.estado = "Aceptado"
     db.commit()
-    db.refresh(desafio)
     return desafio
 
 
@@ -818,7 +861,6 @@ def rechazar_desafio(
 
     desafio.estado = "Rechazado"
     db.commit()
-    db.refresh(desafio)
     return desafio
 
 
@@ -864,7 +906,6 @@ def reprogramar_desafio(
     desafio.hora = nueva_hora
 
     db.commit()
-    db.refresh(desafio)
 
     recipients: Set[int] = {
         retada.jugador1_id,
@@ -908,6 +949,39 @@ def reprogramar_desafio(
     return desafio
 
 
+# campos estáticos del payload de resultado (fuera del hot path)
+_RESULT_DATA_BASE = {"type": "desafio", "event": "result"}
+
+
+def _build_result_push_data(
+    desafio: Desafio,
+    data: ResultadoSets,
+    puesto_en_juego: Optional[int],
+    titulo: str,
+) -> dict:
+    """
+    Arma el `data` del push de resultado con las conversiones str hechas
+    una sola vez (el dict se reutiliza para todo el fan-out de tokens).
+    """
+    S = str
+    out = dict(_RESULT_DATA_BASE)
+    out["desafio_id"] = S(desafio.id)
+    out["ganador_pareja_id"] = S(desafio.ganador_pareja_id or "")
+    out["swap_aplicado"] = S(bool(desafio.swap_aplicado))
+    out["pos_retadora_old"] = S(desafio.pos_retadora_old or "")
+    out["pos_retada_old"] = S(desafio.pos_retada_old or "")
+    out["puesto_en_juego"] = S(puesto_en_juego or "")
+    out["set1"] = f"{data.set1_retador}-{data.set1_desafiado}"
+    out["set2"] = f"{data.set2_retador}-{data.set2_desafiado}"
+    out["set3"] = (
+        f"{data.set3_retador}-{data.set3_desafiado}"
+        if data.set3_retador is not None and data.set3_desafiado is not None
+        else ""
+    )
+    out["titulo"] = titulo
+    return out
+
+
 def _gana_retador(data: ResultadoSets) -> bool:
     sets_ret = 0
     sets_des = 0
@@ -1003,6 +1077,7 @@ def cargar_resultado(
 
     desafio.estado = "Jugado"
     desafio.ganador_pareja_id = ganador_id
+    desafio.resultado_tipo = "normal"
 
     desafio.set1_retador = data.set1_retador
     desafio.set1_desafiado = data.set1_desafiado
@@ -1040,7 +1115,11 @@ def cargar_resultado(
     desafio.ranking_aplicado = True
 
     db.commit()
-    db.refresh(desafio)
+
+    # el resultado cambia stats/posiciones -> invalidar listados cacheados
+    cache_invalidate("jugadores:")
+    cache_invalidate("parejas:")
+    cache_invalidate("ranking:")
 
     recipients: Set[int] = {
         retada.jugador1_id,
@@ -1061,11 +1140,11 @@ def cargar_resultado(
         sets_txt = _fmt_sets(data)
 
         title = "🏁 Resultado cargado"
-        body = (
-            f"🏆 Ganó: {ganador_label}\n"
-            f"🎾 Sets: {sets_txt}\n"
-            + (f"🏅 Puesto en juego: N.º {puesto_en_juego}\n" if puesto_en_juego else "")
-            + "👉 Toca para ver el detalle"
+        puesto_txt = (
+            f"🏅 Puesto en juego: N.º {puesto_en_juego}\n" if puesto_en_juego else ""
+        )
+        body = _RESULTADO_BODY_TMPL.format_map(
+            {"ganador": ganador_label, "sets": sets_txt, "puesto": puesto_txt}
         )
 
         _add_background_push(
@@ -1073,24 +1152,7 @@ def cargar_resultado(
             token_list,
             title=title,
             body=body,
-            data={
-                "type": "desafio",
-                "event": "result",
-                "desafio_id": str(desafio.id),
-                "ganador_pareja_id": str(desafio.ganador_pareja_id or ""),
-                "swap_aplicado": str(bool(desafio.swap_aplicado)),
-                "pos_retadora_old": str(desafio.pos_retadora_old or ""),
-                "pos_retada_old": str(desafio.pos_retada_old or ""),
-                "puesto_en_juego": str(puesto_en_juego or ""),
-                "set1": f"{data.set1_retador}-{data.set1_desafiado}",
-                "set2": f"{data.set2_retador}-{data.set2_desafiado}",
-                "set3": (
-                    f"{data.set3_retador}-{data.set3_desafiado}"
-                    if data.set3_retador is not None and data.set3_desafiado is not None
-                    else ""
-                ),
-                "titulo": titulo,
-            },
+            data=_build_result_push_data(desafio, data, puesto_en_juego, titulo),
         )
 
     return desafio
@@ -1100,18 +1162,34 @@ def cargar_resultado(
 def listar_desafios_pareja(pareja_id: int, db: Session = Depends(get_db)):
     _apply_forfeit_if_expired(db)
 
-    desafios = (
-        db.query(Desafio)
-        .filter(
+    # ✅ PERF: endpoint de solo-lectura -> select() Core con las columnas del
+    # schema; devuelve dicts sin construir entidades ORM ni poblar el
+    # identity map (importa en historiales largos)
+    stmt = (
+        select(
+            Desafio.id,
+            Desafio.fecha,
+            Desafio.hora,
+            Desafio.estado,
+            Desafio.ganador_pareja_id,
+            Desafio.titulo_desafio,
+            Desafio.fecha_jugado,
+            Desafio.set1_retador,
+            Desafio.set1_desafiado,
+            Desafio.set2_retador,
+            Desafio.set2_desafiado,
+            Desafio.set3_retador,
+            Desafio.set3_desafiado,
+        )
+        .where(
             or_(
                 Desafio.retadora_pareja_id == pareja_id,
                 Desafio.retada_pareja_id == pareja_id,
             )
         )
         .order_by(Desafio.fecha.desc(), Desafio.hora.desc(), Desafio.id.desc())
-        .all()
     )
-    return desafios
+    return db.execute(stmt).mappings().all()
 
 
 @router.get("/{desafio_id}", response_model=DesafioResponse)
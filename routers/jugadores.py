@@ -1,12 +1,15 @@
 # routers/jugadores.py
+import json
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, func, or_, select
 from sqlalchemy.orm import Session
 
 from database import get_db
 import models
+from core.cache import cache_get, cache_set
 from schemas.player import (
     JugadorListaResponse,
     JugadorDetalleResponse,
@@ -15,6 +18,9 @@ from schemas.player import (
 
 router = APIRouter()
 
+# TTL del listado de jugadores; se invalida además al cargar resultados
+_LISTA_CACHE_TTL = 300
+
 
 @router.get("/", response_model=List[JugadorListaResponse])
 def listar_jugadores(
@@ -24,8 +30,28 @@ def listar_jugadores(
     """
     Lista jugadores con estadísticas básicas.
     Si se pasa ?grupo=A solo muestra jugadores que tengan pareja en ese grupo.
+
+    ✅ PERF: el listado solo cambia cuando se carga un resultado o se
+    registra una pareja, así que se cachea por grupo (con invalidación
+    desde esos writes).
     """
-    jugadores = db.query(models.Jugador).all()
+    cache_key = f"jugadores:list:{grupo or 'ALL'}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    # ✅ PERF: select() Core con solo las columnas que usa la respuesta —
+    # dicts planos, sin hidratar entidades Jugador ni poblar el identity map
+    jugadores = db.execute(
+        select(
+            models.Jugador.id,
+            models.Jugador.nombre,
+            models.Jugador.apellido,
+            models.Jugador.telefono,
+            models.Jugador.email,
+            models.Jugador.foto_url,
+        )
+    ).mappings().all()
     resultado: list[JugadorListaResponse] = []
 
     for j in jugadores:
@@ -33,8 +59,8 @@ def listar_jugadores(
         q_parejas = db.query(models.Pareja).filter(
             models.Pareja.activo.is_(True),
             or_(
-                models.Pareja.jugador1_id == j.id,
-                models.Pareja.jugador2_id == j.id,
+                models.Pareja.jugador1_id == j["id"],
+                models.Pareja.jugador2_id == j["id"],
             ),
         )
 
@@ -50,33 +76,41 @@ def listar_jugadores(
         grupo_principal = parejas_jugador[0].grupo if parejas_jugador else None
         ids_parejas = [p.id for p in parejas_jugador]
 
+        partidos_jugados = 0
+        victorias = 0
+        retiros = 0
+
         if ids_parejas:
-            desafios = (
-                db.query(models.Desafio)
-                .filter(
+            # ✅ PERF: solo las 3 columnas que usamos, y stream con cursor
+            # server-side (yield_per) — el tally es incremental, nunca se
+            # materializa la lista completa de desafíos en memoria
+            stmt = (
+                select(
+                    models.Desafio.ganador_pareja_id,
+                    models.Desafio.resultado_tipo,
+                    models.Desafio.retadora_pareja_id,
+                    models.Desafio.retada_pareja_id,
+                )
+                .where(
                     models.Desafio.estado == "Jugado",
                     or_(
                         models.Desafio.retadora_pareja_id.in_(ids_parejas),
                         models.Desafio.retada_pareja_id.in_(ids_parejas),
                     ),
                 )
-                .all()
+                .execution_options(stream_results=True, yield_per=1000)
             )
-        else:
-            desafios = []
-
-        partidos_jugados = len(desafios)
-        victorias = 0
-        retiros = 0
-
-        for d in desafios:
-            # ✅ retiro “técnico”: Jugado pero sin ganador (si te pasa con WO/Retiro sin modelar)
-            if d.ganador_pareja_id is None:
-                retiros += 1
-                continue
-
-            if d.ganador_pareja_id in ids_parejas:
-                victorias += 1
+            for ganador_id, resultado_tipo, _retadora, _retada in db.execute(stmt):
+                partidos_jugados += 1
+                # misma regla que el ranking: retiro/wo cuenta como retiro
+                # para el lado que NO ganó; fallback legacy para filas
+                # anteriores a la columna: Jugado sin ganador
+                if ganador_id is not None and ganador_id in ids_parejas:
+                    victorias += 1
+                elif resultado_tipo in ("retiro", "wo") or (
+                    resultado_tipo is None and ganador_id is None
+                ):
+                    retiros += 1
 
         # Derrotas: jugados - ganados - retiros
         derrotas = partidos_jugados - victorias - retiros
@@ -85,12 +119,7 @@ def listar_jugadores(
 
         resultado.append(
             JugadorListaResponse(
-                id=j.id,
-                nombre=j.nombre,
-                apellido=j.apellido,
-                telefono=j.telefono,
-                email=j.email,
-                foto_url=j.foto_url,
+                **j,
                 grupo_principal=grupo_principal,
                 partidos_jugados=partidos_jugados,
                 victorias=victorias,
@@ -99,16 +128,21 @@ def listar_jugadores(
             )
         )
 
+    cache_set(cache_key, resultado, _LISTA_CACHE_TTL)
     return resultado
 
 
-@router.get("/{jugador_id}/detalle", response_model=JugadorDetalleResponse)
-def obtener_detalle_jugador(
+@router.get("/{jugador_id}/detalle/stream")
+def stream_historial_jugador(
     jugador_id: int,
     db: Session = Depends(get_db),
 ):
     """
-    Detalle de un jugador con historial de desafíos.
+    Historial de desafíos de un jugador en NDJSON (una línea por desafío).
+
+    ✅ PERF: usa `yield_per` (cursor server-side) y va emitiendo filas a medida
+    que llegan de la BD, sin armar la lista completa en memoria.
+    Para UIs que necesitan totales/stats sigue existiendo /detalle.
     """
     jugador = (
         db.query(models.Jugador)
@@ -119,7 +153,7 @@ def obtener_detalle_jugador(
         raise HTTPException(status_code=404, detail="Jugador no encontrado.")
 
     parejas = (
-        db.query(models.Pareja)
+        db.query(models.Pareja.id, models.Pareja.grupo)
         .filter(
             models.Pareja.activo.is_(True),
             or_(
@@ -130,12 +164,24 @@ def obtener_detalle_jugador(
         .all()
     )
 
-    grupo_principal = parejas[0].grupo if parejas else None
-    ids_parejas = [p.id for p in parejas]
+    pareja_grupo = {p.id: (p.grupo or "") for p in parejas}
+    ids_parejas = list(pareja_grupo.keys())
 
-    if ids_parejas:
-        desafios = (
-            db.query(models.Desafio)
+    def gen():
+        if not ids_parejas:
+            return
+
+        rows = (
+            db.query(
+                models.Desafio.id,
+                models.Desafio.fecha,
+                models.Desafio.hora,
+                models.Desafio.estado,
+                models.Desafio.titulo_desafio,
+                models.Desafio.ganador_pareja_id,
+                models.Desafio.retadora_pareja_id,
+                models.Desafio.retada_pareja_id,
+            )
             .filter(
                 models.Desafio.estado == "Jugado",
                 or_(
@@ -144,16 +190,126 @@ def obtener_detalle_jugador(
                 ),
             )
             .order_by(models.Desafio.fecha.desc(), models.Desafio.hora.desc())
-            .all()
+            .yield_per(500)
+        )
+
+        for d in rows:
+            if d.retadora_pareja_id in pareja_grupo:
+                pareja_id = d.retadora_pareja_id
+                rol = "retadora"
+            else:
+                pareja_id = d.retada_pareja_id
+                rol = "retada"
+
+            item = {
+                "id": d.id,
+                "fecha": str(d.fecha),
+                "hora": str(d.hora),
+                "estado": d.estado,
+                "titulo_desafio": d.titulo_desafio,
+                "grupo": pareja_grupo.get(pareja_id, ""),
+                "pareja_id": pareja_id,
+                "rol": rol,
+                "es_ganado": (
+                    d.ganador_pareja_id is not None
+                    and d.ganador_pareja_id in pareja_grupo
+                ),
+            }
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(gen(), media_type="application/x-ndjson")
+
+
+@router.get("/{jugador_id}/detalle", response_model=JugadorDetalleResponse)
+def obtener_detalle_jugador(
+    jugador_id: int,
+    limit: Optional[int] = Query(default=None, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Detalle de un jugador con historial de desafíos.
+
+    Con ?limit= (y ?offset=) el historial viene paginado; el total sale de
+    un `count(*) OVER ()` en la MISMA query (sin segundo COUNT) y las stats
+    se agregan en SQL sobre el conjunto completo.
+    """
+    jugador = (
+        db.query(models.Jugador)
+        .filter(models.Jugador.id == jugador_id)
+        .first()
+    )
+    if not jugador:
+        raise HTTPException(status_code=404, detail="Jugador no encontrado.")
+
+    parejas = (
+        db.query(models.Pareja)
+        .filter(
+            models.Pareja.activo.is_(True),
+            or_(
+                models.Pareja.jugador1_id == jugador_id,
+                models.Pareja.jugador2_id == jugador_id,
+            ),
+        )
+        .all()
+    )
+
+    grupo_principal = parejas[0].grupo if parejas else None
+    ids_parejas = [p.id for p in parejas]
+
+    filtros = (
+        models.Desafio.estado == "Jugado",
+        or_(
+            models.Desafio.retadora_pareja_id.in_(ids_parejas),
+            models.Desafio.retada_pareja_id.in_(ids_parejas),
+        ),
+    )
+
+    if ids_parejas:
+        # ✅ PERF: solo las columnas que usa el historial (evita hidratar el ORM completo)
+        columnas = [
+            models.Desafio.id,
+            models.Desafio.fecha,
+            models.Desafio.hora,
+            models.Desafio.estado,
+            models.Desafio.titulo_desafio,
+            models.Desafio.ganador_pareja_id,
+            models.Desafio.resultado_tipo,
+            models.Desafio.retadora_pareja_id,
+            models.Desafio.retada_pareja_id,
+        ]
+        if limit is not None:
+            # ✅ PERF: total en la misma query paginada (sin COUNT aparte)
+            columnas.append(func.count().over().label("total"))
+
+        query = (
+            db.query(*columnas)
+            .filter(*filtros)
+            .order_by(models.Desafio.fecha.desc(), models.Desafio.hora.desc())
         )
+        if limit is not None:
+            query = query.limit(limit).offset(offset)
+
+        desafios = query.all()
     else:
         desafios = []
 
+    if limit is not None and ids_parejas:
+        # página vacía (offset más allá de la última fila): el total real
+        # sale del agregado de stats de más abajo, que cuenta el conjunto
+        # completo en la misma request
+        total_desafios = desafios[0].total if desafios else None
+    else:
+        total_desafios = len(desafios)
+
     partidos_jugados = len(desafios)
     victorias = 0
     retiros = 0
     desafios_items: list[JugadorDesafioItem] = []
 
+    # ✅ PERF: lookup O(1) de grupo por pareja (antes era un scan por desafío)
+    pareja_grupo = {p.id: (p.grupo or "") for p in parejas}
+
     for d in desafios:
         # Con qué pareja jugó y qué rol tuvo
         if d.retadora_pareja_id in ids_parejas:
@@ -164,20 +320,17 @@ def obtener_detalle_jugador(
             rol = "retada"
 
         # grupo del desafio (según la pareja del jugador)
-        grupo_desafio = ""
-        for p in parejas:
-            if p.id == pareja_id:
-                grupo_desafio = p.grupo or ""
-                break
-
-        # ✅ retiro “técnico”
-        if d.ganador_pareja_id is None:
+        grupo_desafio = pareja_grupo.get(pareja_id, "")
+
+        # misma regla que el ranking: retiro/wo cuenta como retiro para el
+        # lado que NO ganó; fallback legacy: Jugado sin ganador
+        es_ganado = d.ganador_pareja_id is not None and d.ganador_pareja_id in ids_parejas
+        if es_ganado:
+            victorias += 1
+        elif d.resultado_tipo in ("retiro", "wo") or (
+            d.resultado_tipo is None and d.ganador_pareja_id is None
+        ):
             retiros += 1
-            es_ganado = False
-        else:
-            es_ganado = d.ganador_pareja_id in ids_parejas
-            if es_ganado:
-                victorias += 1
 
         desafios_items.append(
             JugadorDesafioItem(
@@ -193,6 +346,43 @@ def obtener_detalle_jugador(
             )
         )
 
+    if limit is not None and ids_parejas:
+        # stats sobre el conjunto COMPLETO (la página solo trae una parte);
+        # retiro con la misma regla que el ranking: retiro/wo del lado que
+        # NO ganó, fallback legacy Jugado sin ganador ni resultado_tipo
+        es_retiro = or_(
+            and_(
+                models.Desafio.resultado_tipo.in_(("retiro", "wo")),
+                or_(
+                    models.Desafio.ganador_pareja_id.is_(None),
+                    models.Desafio.ganador_pareja_id.not_in(ids_parejas),
+                ),
+            ),
+            and_(
+                models.Desafio.resultado_tipo.is_(None),
+                models.Desafio.ganador_pareja_id.is_(None),
+            ),
+        )
+        partidos_jugados, victorias, retiros = (
+            db.query(
+                func.count(),
+                func.coalesce(
+                    func.sum(
+                        case(
+                            (models.Desafio.ganador_pareja_id.in_(ids_parejas), 1),
+                            else_=0,
+                        )
+                    ),
+                    0,
+                ),
+                func.coalesce(func.sum(case((es_retiro, 1), else_=0)), 0),
+            )
+            .filter(*filtros)
+            .one()
+        )
+        if total_desafios is None:
+            total_desafios = partidos_jugados
+
     derrotas = partidos_jugados - victorias - retiros
     if derrotas < 0:
         derrotas = 0
@@ -209,5 +399,6 @@ def obtener_detalle_jugador(
         victorias=victorias,
         derrotas=derrotas,
         retiros=retiros,  # ✅ nuevo
+        total_desafios=total_desafios,
         desafios=desafios_items,
     )
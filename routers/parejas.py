@@ -1,12 +1,16 @@
 # routers/parejas.py
-from typing import List, Optional
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import and_, or_
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import and_, bindparam, case, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, joinedload, load_only, raiseload, selectinload
 
 from database import get_db
 import models
+from core.cache import cache_get, cache_set, cache_invalidate
 
 from schemas.pair import (
     JugadorDatos,
@@ -22,33 +26,94 @@ from schemas.pair import (
 
 router = APIRouter()
 
+# TTL corto para las vistas públicas (ranking/cards/desafiables); además
+# se invalida "parejas:" en cada write que toca posiciones o altas
+_PAREJAS_CACHE_TTL = 30
+
+# Columnas que consume ParejaResponse (para load_only en los listados)
+_PAREJA_RESPONSE_COLS = (
+    models.Pareja.id,
+    models.Pareja.jugador1_id,
+    models.Pareja.jugador2_id,
+    models.Pareja.capitan_id,
+    models.Pareja.grupo,
+    models.Pareja.posicion_actual,
+    models.Pareja.activo,
+    models.Pareja.genero,
+)
+
+# ✅ PERF: statement del ranking construido una sola vez al importar el
+# módulo (bindparam para el grupo) — por request solo se ejecuta, sin
+# pagar la construcción del query chain ni recompilar el SQL
+_RANKING_STMT = (
+    select(models.Pareja)
+    .options(load_only(*_PAREJA_RESPONSE_COLS))
+    .where(
+        models.Pareja.grupo == bindparam("grupo"),
+        models.Pareja.activo.is_(True),
+    )
+    .order_by(models.Pareja.posicion_actual.asc())
+)
+
 
 # --------- Helpers ---------
-def get_or_create_jugador(data: JugadorDatos, db: Session) -> models.Jugador:
+def get_or_create_jugadores(datos: List[JugadorDatos], db: Session) -> List[int]:
     """
-    Si existe jugador con ese email -> lo usa.
-    Si no -> lo crea.
+    Resuelve varios jugadores de una vez y devuelve sus ids (mismo orden).
+
+    ✅ PERF: los que tienen email van todos en UN solo UPSERT multi-VALUES
+    (INSERT ... ON CONFLICT (email) DO UPDATE SET email=EXCLUDED.email
+    RETURNING id, email) — un round-trip atómico, sin la carrera
+    SELECT→INSERT. El DO UPDATE no-op garantiza el RETURNING también
+    cuando la fila ya existía. Sin email no hay clave de conflicto:
+    insert directo, como antes.
     """
-    jugador = None
-
-    if data.email:
-        jugador = db.query(models.Jugador).filter(models.Jugador.email == data.email).first()
-
-    if not jugador:
+    ids: Dict[int, int] = {}
+
+    con_email = [(i, d) for i, d in enumerate(datos) if d.email]
+    if con_email:
+        # dedupe por email (dos entradas iguales -> una fila; ON CONFLICT
+        # no puede tocar la misma fila dos veces en un statement)
+        values = {}
+        for _, d in con_email:
+            values.setdefault(
+                d.email,
+                {
+                    "nombre": d.nombre,
+                    "apellido": d.apellido,
+                    "telefono": d.telefono,
+                    "email": d.email,
+                    # foto_url no se carga acá por ahora (lo hará el admin más adelante)
+                },
+            )
+        stmt = pg_insert(models.Jugador).values(list(values.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["email"],
+            set_={"email": stmt.excluded.email},
+        ).returning(models.Jugador.id, models.Jugador.email)
+
+        por_email = {email: jid for jid, email in db.execute(stmt).all()}
+        for i, d in con_email:
+            ids[i] = por_email[d.email]
+
+    for i, d in enumerate(datos):
+        if d.email:
+            continue
         jugador = models.Jugador(
-            nombre=data.nombre,
-            apellido=data.apellido,
-            telefono=data.telefono,
-            email=data.email,
-            # foto_url no se carga acá por ahora (lo hará el admin más adelante)
+            nombre=d.nombre,
+            apellido=d.apellido,
+            telefono=d.telefono,
+            email=None,
         )
         db.add(jugador)
         db.flush()  # conseguimos el id sin commit
+        ids[i] = jugador.id
 
-    return jugador
+    return [ids[i] for i in range(len(datos))]
 
 
-def nombre_pareja(j1: models.Jugador, j2: models.Jugador) -> str:
+def nombre_pareja(j1, j2) -> str:
+    # acepta models.Jugador o JugadorDatos (solo lee nombre/apellido)
     return f"{j1.nombre} {j1.apellido} / {j2.nombre} {j2.apellido}"
 
 
@@ -66,20 +131,22 @@ def _normalize_grupo_filter(grupo: Optional[str]) -> Optional[str]:
     return g if g else None
 
 
+# ✅ PERF: dominio chico y fijo -> dict + lru_cache; cero strip/lower/split
+# repetidos en el hot path (estas helpers corren en cada request de listado)
+_CATEGORIA_TO_GEN = {"femenino": "F", "masculino": "M"}
+
+
+@lru_cache(maxsize=64)
 def _categoria_to_genero(categoria: str) -> Optional[str]:
     """
     Convierte categoría -> genero guardado en BD
     - "Femenino"  -> "F"
     - "Masculino" -> "M"
     """
-    c = (categoria or "").strip().lower()
-    if c == "femenino":
-        return "F"
-    if c == "masculino":
-        return "M"
-    return None
+    return _CATEGORIA_TO_GEN.get((categoria or "").strip().lower())
 
 
+@lru_cache(maxsize=64)
 def _genero_from_grupo(grupo: str) -> Optional[str]:
     """
     Lee el prefijo del grupo y devuelve genero:
@@ -93,6 +160,60 @@ def _genero_from_grupo(grupo: str) -> Optional[str]:
     return _categoria_to_genero(pref)
 
 
+def _stats_por_pareja(db: Session, pareja_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+    """
+    Stats (partidos_jugados, victorias) para un conjunto de parejas.
+
+    ✅ PERF: 2 queries agregadas con GROUP BY (una por lado retadora/retada)
+    en vez de un SELECT de desafíos por pareja (N+1). El conteo lo hace
+    Postgres; acá solo mergeamos ~N filas.
+    """
+    stats: Dict[int, Tuple[int, int]] = {pid: (0, 0) for pid in pareja_ids}
+    if not pareja_ids:
+        return stats
+
+    for lado in (models.Desafio.retadora_pareja_id, models.Desafio.retada_pareja_id):
+        rows = (
+            db.query(
+                lado.label("pid"),
+                func.count().label("jug"),
+                func.sum(
+                    case((models.Desafio.ganador_pareja_id == lado, 1), else_=0)
+                ).label("vic"),
+            )
+            .filter(
+                models.Desafio.estado == "Jugado",
+                lado.in_(pareja_ids),
+            )
+            .group_by(lado)
+            .all()
+        )
+        for r in rows:
+            jug, vic = stats[r.pid]
+            stats[r.pid] = (jug + r.jug, vic + int(r.vic or 0))
+
+    return stats
+
+
+def _cards_etag(db: Session, grupo: Optional[str], limit: Optional[int], offset: int) -> str:
+    """
+    ETag fuerte de la vista de cards: cambia si cambia alguna pareja del
+    filtro (alta/baja/posición) o algún desafío (stats embebidas).
+
+    ✅ PERF: dos agregados chicos en la BD valen la pena — si el ETag
+    matchea devolvemos 304 sin tocar Pydantic ni serializar JSON.
+    """
+    base = db.query(
+        func.max(models.Pareja.updated_at),
+        func.count(models.Pareja.id),
+    ).filter(models.Pareja.activo.is_(True), models.Pareja.posicion_actual.isnot(None))
+    max_pareja, total = _apply_grupo_filter(base, grupo).one()
+    max_desafio = db.query(func.max(models.Desafio.updated_at)).scalar()
+
+    raw = f"{grupo}|{limit}|{offset}|{max_pareja}|{total}|{max_desafio}"
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=16).hexdigest() + '"'
+
+
 def _apply_grupo_filter(q, grupo: Optional[str]):
     g = _normalize_grupo_filter(grupo)
     if not g:
@@ -103,22 +224,14 @@ def _apply_grupo_filter(q, grupo: Optional[str]):
     # categoría completa: "Femenino" / "Masculino"
     if gl == "femenino" or gl == "masculino":
         gen = _categoria_to_genero(g)
-        # doble filtro: por texto del grupo y por genero (si existe en tu BD)
+        # ✅ PERF: igualdad sobre la columna genero (indexada) en vez del
+        # ilike("Femenino %") que fuerza un scan de texto. El genero se
+        # setea siempre al registrar, así que no hace falta el OR legacy.
         if gen:
-            return q.filter(
-                models.Pareja.grupo.ilike(f"{g}%"),
-                or_(models.Pareja.genero.is_(None), models.Pareja.genero == gen),
-            )
+            return q.filter(models.Pareja.genero == gen)
         return q.filter(models.Pareja.grupo.ilike(f"{g}%"))
 
-    # exacto (ej: "Femenino A", "Masculino B")
-    gen = _genero_from_grupo(g)
-    if gen:
-        return q.filter(
-            models.Pareja.grupo == g,
-            or_(models.Pareja.genero.is_(None), models.Pareja.genero == gen),
-        )
-
+    # exacto (ej: "Femenino A", "Masculino B") — igualdad simple, indexable
     return q.filter(models.Pareja.grupo == g)
 
 
@@ -129,6 +242,8 @@ def _apply_grupo_filter(q, grupo: Optional[str]):
 @router.get("/desafiables", response_model=List[ParejaDesafiableResponse])
 def listar_parejas_desafiables(
     grupo: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
     db: Session = Depends(get_db),
 ):
     """
@@ -137,16 +252,49 @@ def listar_parejas_desafiables(
     Ahora soporta filtros:
       - grupo=Femenino | Masculino (categoría)
       - grupo=Femenino A | Masculino B (exacto)
+    Paginación opcional con limit/offset (sin limit devuelve todo, como antes).
     """
+    cache_key = f"parejas:desafiables:{grupo or 'ALL'}:{limit}:{offset}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     q = (
         db.query(models.Pareja)
-        .options(joinedload(models.Pareja.jugador1), joinedload(models.Pareja.jugador2))
+        .options(
+            # ✅ PERF: solo las columnas que usa la respuesta (id/posición/grupo
+            # + nombre y apellido de los jugadores), no las filas enteras
+            load_only(
+                models.Pareja.id,
+                models.Pareja.grupo,
+                models.Pareja.posicion_actual,
+                models.Pareja.nombre_pareja,
+            ),
+            selectinload(models.Pareja.jugador1).load_only(
+                models.Jugador.nombre,
+                models.Jugador.apellido,
+            ),
+            selectinload(models.Pareja.jugador2).load_only(
+                models.Jugador.nombre,
+                models.Jugador.apellido,
+            ),
+            # ✅ guard: cualquier lazy-load accidental explota en vez de
+            # meter un N+1 silencioso
+            raiseload("*"),
+        )
         .filter(models.Pareja.activo.is_(True), models.Pareja.posicion_actual.isnot(None))
     )
 
     q = _apply_grupo_filter(q, grupo)
+    q = q.order_by(models.Pareja.grupo.asc(), models.Pareja.posicion_actual.asc())
 
-    parejas = q.order_by(models.Pareja.grupo.asc(), models.Pareja.posicion_actual.asc()).all()
+    # ✅ PERF: LIMIT/OFFSET en la BD — el peor caso queda acotado a limit
+    if offset:
+        q = q.offset(offset)
+    if limit is not None:
+        q = q.limit(limit)
+
+    parejas = q.all()
 
     resp: List[ParejaDesafiableResponse] = []
     for p in parejas:
@@ -155,18 +303,24 @@ def listar_parejas_desafiables(
         resp.append(
             ParejaDesafiableResponse(
                 id=p.id,
-                nombre=nombre_pareja(j1, j2),
+                # stored para las altas nuevas; f-string para filas legacy
+                nombre=p.nombre_pareja or nombre_pareja(j1, j2),
                 posicion_actual=p.posicion_actual or 0,
                 grupo=p.grupo,
             )
         )
 
+    cache_set(cache_key, resp, _PAREJAS_CACHE_TTL)
     return resp
 
 
 @router.get("/cards", response_model=List[ParejaCardResponse])
 def listar_parejas_cards(
+    request: Request,
+    response: Response,
     grupo: str | None = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
     db: Session = Depends(get_db),
 ):
     """
@@ -175,16 +329,51 @@ def listar_parejas_cards(
     Filtro:
       - grupo=Femenino | Masculino (categoría)
       - grupo=Femenino A | Masculino B (exacto)
+    Paginación opcional con limit/offset (sin limit devuelve todo, como antes).
+    Soporta If-None-Match: con ETag vigente responde 304 sin body.
     """
+    # el ETag se guarda junto al payload cacheado: siempre describe el body
+    # que servimos (uno fresco de la BD + body viejo del cache clavaría a
+    # los clientes en 304 sobre data stale)
+    cache_key = f"parejas:cards:{grupo or 'ALL'}:{limit}:{offset}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        etag, resp = cached
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return resp
+
+    etag = _cards_etag(db, grupo, limit, offset)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     q = (
         db.query(models.Pareja)
-        .options(joinedload(models.Pareja.jugador1), joinedload(models.Pareja.jugador2))
+        .options(
+            selectinload(models.Pareja.jugador1),
+            selectinload(models.Pareja.jugador2),
+            # ✅ guard: cualquier lazy-load accidental explota en vez de
+            # meter un N+1 silencioso
+            raiseload("*"),
+        )
         .filter(models.Pareja.activo.is_(True), models.Pareja.posicion_actual.isnot(None))
     )
 
     q = _apply_grupo_filter(q, grupo)
+    q = q.order_by(models.Pareja.grupo.asc(), models.Pareja.posicion_actual.asc())
+
+    # ✅ PERF: LIMIT/OFFSET en la BD — el peor caso queda acotado a limit
+    if offset:
+        q = q.offset(offset)
+    if limit is not None:
+        q = q.limit(limit)
+
+    parejas = q.all()
 
-    parejas = q.order_by(models.Pareja.grupo.asc(), models.Pareja.posicion_actual.asc()).all()
+    # ✅ PERF: stats solo de las parejas de la página, en 2 queries agregadas
+    stats = _stats_por_pareja(db, [p.id for p in parejas])
 
     resp: List[ParejaCardResponse] = []
 
@@ -192,21 +381,7 @@ def listar_parejas_cards(
         j1 = p.jugador1
         j2 = p.jugador2
 
-        # Stats reales: desafíos jugados donde participó
-        desafios = (
-            db.query(models.Desafio)
-            .filter(
-                models.Desafio.estado == "Jugado",
-                or_(
-                    models.Desafio.retadora_pareja_id == p.id,
-                    models.Desafio.retada_pareja_id == p.id,
-                ),
-            )
-            .all()
-        )
-
-        partidos_jugados = len(desafios)
-        victorias = sum(1 for d in desafios if d.ganador_pareja_id == p.id)
+        partidos_jugados, victorias = stats.get(p.id, (0, 0))
         derrotas = partidos_jugados - victorias
 
         resp.append(
@@ -215,29 +390,19 @@ def listar_parejas_cards(
                 grupo=p.grupo,
                 posicion_actual=p.posicion_actual or 0,
                 activo=p.activo,
-                nombre_pareja=f"{j1.nombre} {j1.apellido} / {j2.nombre} {j2.apellido}",
-                jugador1=JugadorEnPareja(
-                    id=j1.id,
-                    nombre=j1.nombre,
-                    apellido=j1.apellido,
-                    telefono=j1.telefono,
-                    email=j1.email,
-                    foto_url=j1.foto_url,
-                ),
-                jugador2=JugadorEnPareja(
-                    id=j2.id,
-                    nombre=j2.nombre,
-                    apellido=j2.apellido,
-                    telefono=j2.telefono,
-                    email=j2.email,
-                    foto_url=j2.foto_url,
-                ),
+                # stored para las altas nuevas; f-string para filas legacy
+                nombre_pareja=p.nombre_pareja or nombre_pareja(j1, j2),
+                # ✅ PERF: model_validate usa el fast-path from_attributes de
+                # pydantic-core en vez de armar el dict campo a campo en Python
+                jugador1=JugadorEnPareja.model_validate(j1),
+                jugador2=JugadorEnPareja.model_validate(j2),
                 partidos_jugados=partidos_jugados,
                 victorias=victorias,
                 derrotas=derrotas,
             )
         )
 
+    cache_set(cache_key, (etag, resp), _PAREJAS_CACHE_TTL)
     return resp
 
 
@@ -250,15 +415,13 @@ def obtener_ranking_por_grupo(
     Devuelve el ranking de parejas de un grupo (solo activas),
     ordenado por posicion_actual ascendente.
     """
-    parejas = (
-        db.query(models.Pareja)
-        .filter(
-            models.Pareja.grupo == grupo,
-            models.Pareja.activo.is_(True),
-        )
-        .order_by(models.Pareja.posicion_actual.asc())
-        .all()
-    )
+    cache_key = f"parejas:ranking:{grupo}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    # ✅ PERF: statement precompilado a nivel módulo, solo se bindea el grupo
+    parejas = db.scalars(_RANKING_STMT, {"grupo": grupo}).all()
 
     if not parejas:
         raise HTTPException(
@@ -266,7 +429,10 @@ def obtener_ranking_por_grupo(
             detail=f"No se encontraron parejas activas en el grupo {grupo}.",
         )
 
-    return parejas
+    # cacheamos el schema (no los objetos ORM, que quedan detached)
+    resp = [ParejaResponse.model_validate(p) for p in parejas]
+    cache_set(cache_key, resp, _PAREJAS_CACHE_TTL)
+    return resp
 
 
 # --------- CRUD / Listados generales ---------
@@ -276,63 +442,68 @@ def obtener_ranking_por_grupo(
     status_code=status.HTTP_201_CREATED,
 )
 def registrar_pareja(payload: ParejaRegistro, db: Session = Depends(get_db)):
-    # 1) Crear / obtener jugadores
-    j1 = get_or_create_jugador(payload.jugador1, db)
-    j2 = get_or_create_jugador(payload.jugador2, db)
+    # 1) Crear / obtener jugadores (solo necesitamos los ids)
+    # ✅ PERF: los dos en un solo UPSERT multi-VALUES
+    j1_id, j2_id = get_or_create_jugadores([payload.jugador1, payload.jugador2], db)
 
-    if j1.id == j2.id:
+    if j1_id == j2_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Los dos jugadores de la pareja deben ser distintos.",
         )
 
     # 2) Capitán
-    capitan = j1 if payload.capitan == 1 else j2
+    capitan_id = j1_id if payload.capitan == 1 else j2_id
 
     # 3) Verificar si ya existe esa pareja en ese grupo (en cualquier orden)
+    # ✅ PERF: chequeo de existencia (solo el id, LIMIT 1) — no hidratamos
+    # la Pareja entera únicamente para descartarla
     existente = (
-        db.query(models.Pareja)
+        db.query(models.Pareja.id)
         .filter(
             models.Pareja.grupo == payload.grupo,
             or_(
                 and_(
-                    models.Pareja.jugador1_id == j1.id,
-                    models.Pareja.jugador2_id == j2.id,
+                    models.Pareja.jugador1_id == j1_id,
+                    models.Pareja.jugador2_id == j2_id,
                 ),
                 and_(
-                    models.Pareja.jugador1_id == j2.id,
-                    models.Pareja.jugador2_id == j1.id,
+                    models.Pareja.jugador1_id == j2_id,
+                    models.Pareja.jugador2_id == j1_id,
                 ),
             ),
         )
-        .first()
+        .limit(1)
+        .scalar()
     )
 
-    if existente:
+    if existente is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Esta pareja ya está registrada en este grupo.",
         )
 
     # 4) Posición inicial = último lugar del grupo + 1
-    last_pos = (
-        db.query(models.Pareja.posicion_actual)
+    # ✅ PERF: MAX directo en SQL (+1 y default 1 incluidos) en vez de
+    # ordenar y traer una fila para hacer la cuenta en Python
+    next_pos = (
+        db.query(func.coalesce(func.max(models.Pareja.posicion_actual), 0) + 1)
         .filter(models.Pareja.grupo == payload.grupo)
-        .order_by(models.Pareja.posicion_actual.desc())
-        .first()
+        .scalar()
     )
-    next_pos = (last_pos[0] + 1) if last_pos and last_pos[0] is not None else 1
 
     # ✅ genero automático por grupo (porque ya lo agregaste en Neon)
     genero_auto = _genero_from_grupo(payload.grupo)
 
     # 5) Crear la pareja
     pareja = models.Pareja(
-        jugador1_id=j1.id,
-        jugador2_id=j2.id,
-        capitan_id=capitan.id,
+        jugador1_id=j1_id,
+        jugador2_id=j2_id,
+        capitan_id=capitan_id,
         grupo=payload.grupo,
         posicion_actual=next_pos,
+        # ✅ materializado acá para que los listados no joineen jugadores
+        nombre_pareja=nombre_pareja(payload.jugador1, payload.jugador2),
         genero=genero_auto,  # ✅ NUEVO (no rompe, es nullable)
         activo=True,
     )
@@ -341,6 +512,12 @@ def registrar_pareja(payload: ParejaRegistro, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(pareja)
 
+    # alta nueva -> invalidar vistas cacheadas de parejas, jugadores y ranking
+    # (la pareja nueva aparece en /ranking/posiciones)
+    cache_invalidate("parejas:")
+    cache_invalidate("jugadores:")
+    cache_invalidate("ranking:")
+
     return pareja
 
 
@@ -355,7 +532,8 @@ def listar_parejas(
       - grupo=Femenino | Masculino  (categoría)
       - grupo=Femenino A | Masculino B (exacto)
     """
-    query = db.query(models.Pareja)
+    # ✅ PERF: solo las columnas de ParejaResponse
+    query = db.query(models.Pareja).options(load_only(*_PAREJA_RESPONSE_COLS))
     query = _apply_grupo_filter(query, grupo)
 
     parejas = query.order_by(models.Pareja.grupo, models.Pareja.posicion_actual).all()
@@ -434,7 +612,17 @@ def obtener_detalle_pareja(
     """
     Detalle de una pareja con info de jugadores y estadísticas.
     """
-    pareja = db.query(models.Pareja).filter(models.Pareja.id == pareja_id).first()
+    # ✅ PERF: 1 query con joinedload (antes: pareja + 3 SELECTs de jugador)
+    pareja = (
+        db.query(models.Pareja)
+        .options(
+            joinedload(models.Pareja.jugador1),
+            joinedload(models.Pareja.jugador2),
+            joinedload(models.Pareja.capitan),
+        )
+        .filter(models.Pareja.id == pareja_id)
+        .first()
+    )
 
     if not pareja:
         raise HTTPException(
@@ -442,9 +630,9 @@ def obtener_detalle_pareja(
             detail="Pareja no encontrada.",
         )
 
-    jugador1 = db.query(models.Jugador).filter(models.Jugador.id == pareja.jugador1_id).first()
-    jugador2 = db.query(models.Jugador).filter(models.Jugador.id == pareja.jugador2_id).first()
-    capitan = db.query(models.Jugador).filter(models.Jugador.id == pareja.capitan_id).first()
+    jugador1 = pareja.jugador1
+    jugador2 = pareja.jugador2
+    capitan = pareja.capitan
 
     if not jugador1 or not jugador2 or not capitan:
         raise HTTPException(
@@ -452,8 +640,18 @@ def obtener_detalle_pareja(
             detail="Datos de jugadores incompletos para esta pareja.",
         )
 
-    desafios = (
-        db.query(models.Desafio)
+    # ✅ PERF: dos enteros en 1 agregado SQL — antes se instanciaba un ORM
+    # Desafio por partido jugado solo para contar en Python
+    partidos_jugados, victorias = (
+        db.query(
+            func.count(),
+            func.coalesce(
+                func.sum(
+                    case((models.Desafio.ganador_pareja_id == pareja_id, 1), else_=0)
+                ),
+                0,
+            ),
+        )
         .filter(
             models.Desafio.estado == "Jugado",
             or_(
@@ -461,11 +659,9 @@ def obtener_detalle_pareja(
                 models.Desafio.retada_pareja_id == pareja_id,
             ),
         )
-        .all()
+        .one()
     )
-
-    partidos_jugados = len(desafios)
-    victorias = sum(1 for d in desafios if d.ganador_pareja_id == pareja_id)
+    victorias = int(victorias)
     derrotas = partidos_jugados - victorias
 
     return ParejaDetalleResponse(
@@ -473,30 +669,9 @@ def obtener_detalle_pareja(
         grupo=pareja.grupo,
         posicion_actual=pareja.posicion_actual,
         activo=pareja.activo,
-        jugador1=JugadorEnPareja(
-            id=jugador1.id,
-            nombre=jugador1.nombre,
-            apellido=jugador1.apellido,
-            telefono=jugador1.telefono,
-            email=jugador1.email,
-            foto_url=getattr(jugador1, "foto_url", None),
-        ),
-        jugador2=JugadorEnPareja(
-            id=jugador2.id,
-            nombre=jugador2.nombre,
-            apellido=jugador2.apellido,
-            telefono=jugador2.telefono,
-            email=jugador2.email,
-            foto_url=getattr(jugador2, "foto_url", None),
-        ),
-        capitan=JugadorEnPareja(
-            id=capitan.id,
-            nombre=capitan.nombre,
-            apellido=capitan.apellido,
-            telefono=capitan.telefono,
-            email=capitan.email,
-            foto_url=getattr(capitan, "foto_url", None),
-        ),
+        jugador1=JugadorEnPareja.model_validate(jugador1),
+        jugador2=JugadorEnPareja.model_validate(jugador2),
+        capitan=JugadorEnPareja.model_validate(capitan),
         partidos_jugados=partidos_jugados,
         victorias=victorias,
         derrotas=derrotas,
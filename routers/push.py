@@ -1,59 +1,133 @@
 # routers/push.py
+import asyncio
 from datetime import datetime
+
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from database import get_db
 from core.security import get_current_jugador
-from schemas.push import PushTokenUpsert, PushSendToJugador, PushSendToMe
+from schemas.push import _JWT_RE, PushTokenUpsert, PushSendToJugador, PushSendToMany, PushSendToMe
 from models import PushToken
 from core.firebase_admin import send_push_to_tokens
 
 router = APIRouter(prefix="/push", tags=["Push"])
 
+# fan-out masivo: lotes de 500 (límite multicast FCM) con a lo sumo 8 en vuelo
+_PUSH_BATCH_SIZE = 500
+_MAX_CONCURRENT_BATCHES = 8
+
 
-def _valid_tokens(rows):
-    # filtra + dedupe (1 noti por token real)
-    tokens = [t.fcm_token for t in rows if t.fcm_token and len(t.fcm_token) > 20]
+def _dedupe_tokens(tokens) -> list:
+    """
+    Dedupe preservando orden + descarta tokens con forma de JWT (data
+    legacy anterior al validator de PushTokenUpsert). Enviar el mismo
+    token dos veces duplica la notificación y quema cuota FCM.
+    """
     seen = set()
     out = []
-    for tok in tokens:
-        if tok in seen:
+    for t in tokens:
+        if not t or len(t) < 20 or _JWT_RE.match(t) or t in seen:
             continue
-        seen.add(tok)
-        out.append(tok)
+        seen.add(t)
+        out.append(t)
     return out
 
 
+def _tokens_de_jugador(db: Session, jugador_id: int) -> list:
+    """
+    Tokens FCM válidos (largo > 20) y únicos de un jugador.
+
+    ✅ PERF: el filtro + DISTINCT lo hace la BD (usa el unique
+    (jugador_id, fcm_token)); no viajan filas de más ni se dedupea en Python.
+    """
+    rows = (
+        db.query(PushToken.fcm_token)
+        .filter(
+            PushToken.jugador_id == jugador_id,
+            func.length(PushToken.fcm_token) > 20,
+        )
+        .distinct()
+        .all()
+    )
+    return _dedupe_tokens(t for (t,) in rows)
+
+
+# tope de devices guardados por jugador (Safari + PWA + celu viejo, etc.)
+_MAX_TOKENS_POR_JUGADOR = 5
+
+
+def _prune_old_tokens(
+    db: Session,
+    jugador_id: int,
+    keep: int = _MAX_TOKENS_POR_JUGADOR,
+) -> None:
+    """
+    Deja solo los `keep` tokens más recientes del jugador.
+
+    ✅ PERF: un único DELETE con subquery (id NOT IN el top-`keep` por
+    created_at DESC) — nada de traer filas a Python ni borrar de a una.
+    """
+    recientes = (
+        db.query(PushToken.id)
+        .filter(PushToken.jugador_id == jugador_id)
+        .order_by(PushToken.created_at.desc())
+        .limit(keep)
+        .subquery()
+    )
+    (
+        db.query(PushToken)
+        .filter(
+            PushToken.jugador_id == jugador_id,
+            ~PushToken.id.in_(select(recientes.c.id)),
+        )
+        .delete(synchronize_session=False)
+    )
+
+
+def _tiene_tokens(db: Session, jugador_id: int) -> bool:
+    return (
+        db.query(PushToken.id)
+        .filter(PushToken.jugador_id == jugador_id)
+        .limit(1)
+        .scalar()
+        is not None
+    )
+
+
 @router.post("/token")
 def save_push_token(
     payload: PushTokenUpsert,
     db: Session = Depends(get_db),
     jugador=Depends(get_current_jugador),
 ):
-    token = (payload.fcm_token or "").strip()
-
-    if not token or len(token) < 20:
-        raise HTTPException(status_code=400, detail="FCM token inválido")
-
-    existing = (
-        db.query(PushToken)
-        .filter(PushToken.jugador_id == jugador.id, PushToken.fcm_token == token)
-        .first()
-    )
+    # el token ya llega validado (strip + largo + guard anti-JWT) por el
+    # field_validator de PushTokenUpsert
+    token = payload.fcm_token
 
     now = datetime.utcnow()
 
-    if existing:
-        # ✅ refrescar "último dispositivo activo"
-        existing.created_at = now
-        db.commit()
-        return {"ok": True, "jugador_id": jugador.id, "saved": "refreshed"}
-
-    db.add(PushToken(jugador_id=jugador.id, fcm_token=token, created_at=now))
+    # ✅ PERF: UPSERT atómico en 1 round-trip (antes: SELECT + INSERT/UPDATE,
+    # con ventana de carrera al registrar el mismo device dos veces).
+    # El DO UPDATE refresca created_at = "último dispositivo activo".
+    stmt = (
+        pg_insert(PushToken)
+        .values(jugador_id=jugador.id, fcm_token=token, created_at=now)
+        .on_conflict_do_update(
+            constraint="uq_push_tokens_jugador_fcm",
+            set_={"created_at": now},
+        )
+    )
+    db.execute(stmt)
+    # ✅ PERF: poda en el mismo commit — un jugador nunca acumula más de
+    # _MAX_TOKENS_POR_JUGADOR devices (tokens viejos = envíos que fallan).
+    _prune_old_tokens(db, jugador.id)
     db.commit()
 
-    return {"ok": True, "jugador_id": jugador.id, "saved": "inserted"}
+    return {"ok": True, "jugador_id": jugador.id, "saved": "upserted"}
 
 
 @router.post("/send-to-me")
@@ -62,12 +136,10 @@ def send_to_me(
     db: Session = Depends(get_db),
     jugador=Depends(get_current_jugador),
 ):
-    rows = db.query(PushToken).filter(PushToken.jugador_id == jugador.id).all()
-    if not rows:
-        raise HTTPException(status_code=404, detail="Este jugador no tiene token registrado")
-
-    token_list = _valid_tokens(rows)
+    token_list = _tokens_de_jugador(db, jugador.id)
     if not token_list:
+        if not _tiene_tokens(db, jugador.id):
+            raise HTTPException(status_code=404, detail="Este jugador no tiene token registrado")
         raise HTTPException(status_code=400, detail="Este jugador no tiene FCM tokens válidos guardados")
 
     result = send_push_to_tokens(
@@ -85,12 +157,10 @@ def send_to_jugador(
     db: Session = Depends(get_db),
     jugador=Depends(get_current_jugador),
 ):
-    rows = db.query(PushToken).filter(PushToken.jugador_id == payload.jugador_id).all()
-    if not rows:
-        raise HTTPException(status_code=404, detail="Ese jugador no tiene token registrado")
-
-    token_list = _valid_tokens(rows)
+    token_list = _tokens_de_jugador(db, payload.jugador_id)
     if not token_list:
+        if not _tiene_tokens(db, payload.jugador_id):
+            raise HTTPException(status_code=404, detail="Ese jugador no tiene token registrado")
         raise HTTPException(status_code=400, detail="Ese jugador no tiene FCM tokens válidos guardados")
 
     result = send_push_to_tokens(
@@ -100,3 +170,76 @@ def send_to_jugador(
         data=payload.data or {"type": "test", "scope": "jugador", "from": str(jugador.id)},
     )
     return {"to_jugador_id": payload.jugador_id, **result}
+
+
+@router.post("/send-to-many")
+async def send_to_many(
+    payload: PushSendToMany,
+    db: Session = Depends(get_db),
+    jugador=Depends(get_current_jugador),
+):
+    """
+    Envía la misma notificación a varios jugadores.
+
+    ✅ PERF: UN solo SELECT con in_() para todos los jugadores (no un
+    round-trip por jugador) y fan-out concurrente a FCM en lotes de 500
+    con asyncio.gather (a lo sumo _MAX_CONCURRENT_BATCHES en vuelo) —
+    nada de esto bloquea el event loop.
+    """
+    ids = list(dict.fromkeys(payload.jugador_ids))
+
+    def _fetch_rows():
+        return db.execute(
+            select(PushToken.jugador_id, PushToken.fcm_token)
+            .where(
+                PushToken.jugador_id.in_(ids),
+                func.length(PushToken.fcm_token) > 20,
+            )
+            .distinct()
+        ).all()
+
+    rows = await run_in_threadpool(_fetch_rows)
+
+    # el mismo device puede estar registrado bajo dos jugadores: dedupe
+    # entre jugadores antes del fan-out
+    con_token = {jid for jid, _ in rows}
+    token_list = _dedupe_tokens(tok for _, tok in rows)
+
+    if not token_list:
+        raise HTTPException(
+            status_code=404,
+            detail="Ninguno de esos jugadores tiene FCM tokens válidos guardados",
+        )
+
+    data = payload.data or {"type": "test", "scope": "many", "from": str(jugador.id)}
+    sem = asyncio.Semaphore(_MAX_CONCURRENT_BATCHES)
+
+    async def _send(batch):
+        async with sem:
+            return await run_in_threadpool(
+                send_push_to_tokens,
+                batch,
+                title=payload.title,
+                body=payload.body,
+                data=data,
+            )
+
+    batches = [
+        token_list[i:i + _PUSH_BATCH_SIZE]
+        for i in range(0, len(token_list), _PUSH_BATCH_SIZE)
+    ]
+    results = await asyncio.gather(*(_send(b) for b in batches))
+
+    result = {"ok": True, "success": 0, "failure": 0, "errors": [], "invalid_tokens": []}
+    for r in results:
+        result["success"] += r.get("success", 0)
+        result["failure"] += r.get("failure", 0)
+        result["errors"].extend(r.get("errors", []))
+        result["invalid_tokens"].extend(r.get("invalid_tokens", []))
+
+    return {
+        "jugador_ids": ids,
+        "con_token": sorted(con_token),
+        "sin_token": sorted(set(ids) - con_token),
+        **result,
+    }
@@ -1,16 +1,101 @@
 # routers/ranking.py
-from fastapi import APIRouter, Depends
+import hashlib
+
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from sqlalchemy.orm import Session, load_only, raiseload, selectinload
+from sqlalchemy import and_, case, func, or_, select
 
 from database import get_db
-from models import Pareja, Desafio
+from models import Jugador, Pareja, Desafio
+from core.cache import cache_get, cache_set
 
 router = APIRouter(prefix="/ranking", tags=["ranking"])
 
+# TTL corto: la tabla de posiciones es la vista más pedida; además los
+# writes de desafíos invalidan "ranking:" al cargar resultado/forfeit
+_RANKING_CACHE_TTL = 60
+
+
+def _calc_stats_for_parejas(
+    db: Session, pareja_ids: List[int]
+) -> Tuple[Dict[int, int], Dict[int, int], Dict[int, int]]:
+    """
+    Stats (ganados, perdidos, retiros) por pareja, como tres dicts planos
+    paralelos keyed por pareja_id.
+
+    ✅ PERF: 2 queries agregadas con GROUP BY (una por lado retadora/retada,
+    COUNT + SUM(CASE) para las victorias) en vez de hidratar todos los
+    desafíos Jugado y contarlos en Python — cruzan ~N_parejas filas, no
+    N_desafios objetos ORM. Los dicts planos evitan el doble lookup y los
+    N dicts chicos de la versión dict-of-dicts.
+    """
+    ganados = dict.fromkeys(pareja_ids, 0)
+    perdidos = dict.fromkeys(pareja_ids, 0)
+    retiros = dict.fromkeys(pareja_ids, 0)
+    if not pareja_ids:
+        return ganados, perdidos, retiros
+
+    jugados = dict.fromkeys(pareja_ids, 0)
+
+    # ✅ PERF: select() de Core ejecutado directo — tuplas planas, sin
+    # pasar por la maquinaria de entidades de db.query
+    for lado in (Desafio.retadora_pareja_id, Desafio.retada_pareja_id):
+        # retiro real = resultado_tipo "retiro"/"wo" del lado que NO ganó;
+        # fallback legacy para filas anteriores a la columna: Jugado sin ganador
+        es_retiro = or_(
+            and_(
+                Desafio.resultado_tipo.in_(("retiro", "wo")),
+                or_(
+                    Desafio.ganador_pareja_id.is_(None),
+                    Desafio.ganador_pareja_id != lado,
+                ),
+            ),
+            and_(
+                Desafio.resultado_tipo.is_(None),
+                Desafio.ganador_pareja_id.is_(None),
+            ),
+        )
+        stmt = (
+            select(
+                lado,
+                func.count(),
+                func.sum(case((Desafio.ganador_pareja_id == lado, 1), else_=0)),
+                func.sum(case((es_retiro, 1), else_=0)),
+            )
+            .where(
+                Desafio.estado == "Jugado",
+                lado.in_(pareja_ids),
+            )
+            .group_by(lado)
+        )
+        for pid, jug, gan, ret in db.execute(stmt):
+            jugados[pid] += jug
+            ganados[pid] += int(gan or 0)
+            retiros[pid] += int(ret or 0)
+
+    for pid in pareja_ids:
+        perdidos[pid] = max(0, jugados[pid] - ganados[pid] - retiros[pid])
+
+    return ganados, perdidos, retiros
+
+
+def _posiciones_etag(db: Session) -> str:
+    """
+    ETag fuerte de la tabla de posiciones: cambia cuando cambia algún
+    desafío (resultados) o alguna pareja (altas/posiciones).
+
+    ✅ PERF: dos MAX(updated_at) baratos — si el ETag matchea el poll
+    devuelve 304 sin body ni serialización.
+    """
+    max_pareja = db.query(func.max(Pareja.updated_at)).scalar()
+    max_desafio = db.query(func.max(Desafio.updated_at)).scalar()
+    raw = f"{max_pareja}|{max_desafio}"
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=16).hexdigest() + '"'
+
 
 class PosicionRanking(BaseModel):
     id: int
@@ -27,12 +112,34 @@ class PosicionRanking(BaseModel):
 
 
 @router.get("/posiciones", response_model=List[PosicionRanking])
-def get_posiciones_ranking(db: Session = Depends(get_db)):
+def get_posiciones_ranking(request: Request, db: Session = Depends(get_db)):
+    # ✅ PERF: en hit devolvemos los dicts cacheados directo por orjson —
+    # sin re-validar contra PosicionRanking ni pasar por jsonable_encoder.
+    # El ETag viaja GUARDADO junto al payload: siempre describe el body que
+    # servimos (un ETag fresco de la BD + body viejo del cache clavaría a
+    # los clientes en 304 sobre data stale).
+    cached = cache_get("ranking:posiciones")
+    if cached is not None:
+        etag, payload = cached
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return ORJSONResponse(payload, headers={"ETag": etag})
+
+    # la mayoría de los polls vuelven sin cambios: ETag primero, 304 sin body
+    etag = _posiciones_etag(db)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
     parejas = (
         db.query(Pareja)
         .options(
-            joinedload(Pareja.jugador1),
-            joinedload(Pareja.jugador2),
+            # ✅ PERF: solo las columnas que usa la respuesta, no las filas enteras
+            load_only(Pareja.id, Pareja.grupo, Pareja.posicion_actual, Pareja.nombre_pareja),
+            selectinload(Pareja.jugador1).load_only(Jugador.nombre, Jugador.apellido),
+            selectinload(Pareja.jugador2).load_only(Jugador.nombre, Jugador.apellido),
+            # ✅ guard: cualquier lazy-load accidental explota en vez de
+            # meter un N+1 silencioso
+            raiseload("*"),
         )
         .filter(Pareja.activo.is_(True), Pareja.posicion_actual.isnot(None))
         .order_by(Pareja.grupo.asc(), Pareja.posicion_actual.asc())
@@ -41,63 +148,35 @@ def get_posiciones_ranking(db: Session = Depends(get_db)):
 
     pareja_ids = [p.id for p in parejas]
 
-    # Stats por pareja
-    stats: Dict[int, Dict[str, int]] = {pid: {"ganados": 0, "perdidos": 0, "retiros": 0} for pid in pareja_ids}
-
-    if pareja_ids:
-        desafios = (
-            db.query(Desafio)
-            .filter(
-                Desafio.estado == "Jugado",
-                or_(
-                    Desafio.retadora_pareja_id.in_(pareja_ids),
-                    Desafio.retada_pareja_id.in_(pareja_ids),
-                ),
-            )
-            .all()
-        )
-
-        jugados_count: Dict[int, int] = {pid: 0 for pid in pareja_ids}
-
-        for d in desafios:
-            # cuenta jugado para ambas parejas participantes
-            if d.retadora_pareja_id in jugados_count:
-                jugados_count[d.retadora_pareja_id] += 1
-            if d.retada_pareja_id in jugados_count:
-                jugados_count[d.retada_pareja_id] += 1
-
-            # suma victoria al ganador
-            if d.ganador_pareja_id is not None and d.ganador_pareja_id in stats:
-                stats[d.ganador_pareja_id]["ganados"] += 1
-
-        # perdidos = jugados - ganados
-        for pid in pareja_ids:
-            ganados = stats[pid]["ganados"]
-            jugados = jugados_count.get(pid, 0)
-            stats[pid]["perdidos"] = max(0, jugados - ganados)
-            # retiros queda 0 por ahora
+    # Stats por pareja (agregado en SQL)
+    ganados, perdidos, retiros = _calc_stats_for_parejas(db, pareja_ids)
 
     resp: List[PosicionRanking] = []
     for p in parejas:
         j1 = p.jugador1
         j2 = p.jugador2
 
-        nombre = f"{j1.nombre} {j1.apellido} / {j2.nombre} {j2.apellido}"
-
-        s = stats.get(p.id, {"ganados": 0, "perdidos": 0, "retiros": 0})
+        # stored para las altas nuevas; f-string para filas legacy sin backfill
+        nombre = p.nombre_pareja or f"{j1.nombre} {j1.apellido} / {j2.nombre} {j2.apellido}"
 
+        # ✅ PERF: model_construct saltea la validación — todos los valores
+        # salen de columnas tipadas y de nuestros propios ints
         resp.append(
-            PosicionRanking(
+            PosicionRanking.model_construct(
                 id=p.id,
                 pareja_id=p.id,
                 nombre_pareja=nombre,
                 grupo=p.grupo,
                 posicion_actual=p.posicion_actual or 0,
-                ganados=s["ganados"],
-                perdidos=s["perdidos"],
-                retiros=s["retiros"],
+                ganados=ganados[p.id],
+                perdidos=perdidos[p.id],
+                retiros=retiros[p.id],
                 cuota_al_dia=True,  # por ahora fijo; luego lo conectamos
             )
         )
 
-    return resp
+    # cacheamos dicts planos (no los modelos) para que el hit sea solo
+    # orjson, y el ETag junto a ellos para que nunca se desincronicen
+    payload = [r.model_dump() for r in resp]
+    cache_set("ranking:posiciones", (etag, payload), _RANKING_CACHE_TTL)
+    return ORJSONResponse(payload, headers={"ETag": etag})
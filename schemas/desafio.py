@@ -7,14 +7,6 @@ from typing import Optional
 from pydantic import BaseModel, ConfigDict
 
 
-class DesafioCreate(BaseModel):
-    retadora_pareja_id: Optional [int] = None
-    retada_pareja_id: int
-    fecha: date
-    hora: time
-    observacion: Optional[str] = None
-
-
 class DesafioResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -54,6 +46,8 @@ class DesafioResponse(BaseModel):
     puesto_en_juego: Optional[int] = None
 
 
+# ✅ Versión canónica (antes había una copia con es_ganado en schemas/pair.py
+# y otra con sets acá — dos builds de pydantic-core para lo mismo).
 class DesafioHistorialItem(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -64,6 +58,9 @@ class DesafioHistorialItem(BaseModel):
     ganador_pareja_id: Optional[int] = None
     titulo_desafio: str
 
+    # usado por el historial de pareja (calculado, no viene del ORM)
+    es_ganado: Optional[bool] = None
+
     fecha_jugado: Optional[date] = None
     set1_retador: Optional[int] = None
     set1_desafiado: Optional[int] = None
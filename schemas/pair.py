@@ -1,5 +1,4 @@
 # schemas/pair.py
-from datetime import date, time
 from typing import List, Optional
 
 from pydantic import BaseModel
@@ -48,13 +47,9 @@ class ParejaResponse(BaseModel):
 
 
 # ---- Historial de pareja ----
-class DesafioHistorialItem(BaseModel):
-    id: int
-    fecha: date
-    hora: time
-    estado: str
-    titulo_desafio: str
-    es_ganado: bool
+# ✅ re-export de la versión canónica (superset con sets + es_ganado);
+# antes había una copia local duplicada
+from schemas.desafio import DesafioHistorialItem  # noqa: E402
 
 
 class ParejaHistorialResponse(BaseModel):
@@ -55,4 +55,6 @@ class JugadorDetalleResponse(JugadorSimple):
     victorias: int
     derrotas: int
     retiros: int = 0  # ✅ nuevo
+    # total de desafíos jugados (útil cuando `desafios` viene paginado)
+    total_desafios: Optional[int] = None
     desafios: List[JugadorDesafioItem]
@@ -1,9 +1,30 @@
 # schemas/push.py
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+import re
+
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, Dict, Any, List
+
+# ✅ compilado una sola vez al importar: detecta strings con forma de JWT
+# (header.payload.signature en base64url) que algunos clientes mandan por
+# error en lugar del FCM token
+_JWT_RE = re.compile(r"^eyJ[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-]+$")
+
+_FCM_MIN = 20
+
 
 class PushTokenUpsert(BaseModel):
-    fcm_token: str = Field(..., min_length=20)
+    fcm_token: str = Field(..., min_length=_FCM_MIN)
+
+    @field_validator("fcm_token")
+    @classmethod
+    def _fcm_token_valido(cls, v: str) -> str:
+        """Basura afuera en la capa pydantic: nunca llega a la BD."""
+        v = (v or "").strip()
+        if len(v) < _FCM_MIN:
+            raise ValueError("FCM token inválido")
+        if _JWT_RE.match(v):
+            raise ValueError("Eso parece un JWT, no un FCM token")
+        return v
 
 class PushTokenResponse(BaseModel):
     ok: bool
@@ -19,3 +40,10 @@ class PushSendToMe(BaseModel):
     title: str = Field(default="Ranking Pádel")
     body: str = Field(default="Notificación de prueba")
     data: Optional[Dict[str, Any]] = None
+
+
+class PushSendToMany(BaseModel):
+    jugador_ids: List[int] = Field(..., min_length=1)
+    title: str = Field(default="Ranking Pádel")
+    body: str = Field(default="Notificación de prueba")
+    data: Optional[Dict[str, Any]] = None